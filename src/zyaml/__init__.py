@@ -1,3 +1,5 @@
+import functools
+
 from .scanner import Scanner
 from .visitor import TokenVisitor
 
@@ -18,6 +20,25 @@ def load_path(path, visitor=TokenVisitor):
         return deserialized(Scanner(fh), visitor)
 
 
+def load_paths(paths, workers=None, visitor=TokenVisitor):
+    """
+    Args:
+        paths (list): Paths to files to deserialize, each file is parsed in its own worker process
+        workers (int | None): Number of worker processes to use (default: one per CPU)
+        visitor (type(TokenVisitor)): Visitor to use
+
+    Returns:
+        (list): Deserialized documents of each file, in the same order as 'paths'
+    """
+    if not paths:
+        return []
+
+    import multiprocessing  # Imported on demand, it noticeably slows down 'import zyaml'
+
+    with multiprocessing.Pool(workers) as pool:
+        return pool.map(functools.partial(load_path, visitor=visitor), paths)
+
+
 def load_string(text, visitor=TokenVisitor):
     """
     Args:
@@ -1,24 +1,25 @@
+import base64
 import codecs
 import datetime
+import functools
 import re
-import sys
+from typing import Optional, Union
 
-import dateutil  # TODO: find stdlib equivalent
-import dateutil.tz
 
-
-PY2 = sys.version_info < (3, 0)
-UTC = dateutil.tz.tzoffset("UTC", 0)
-
-RE_SIMPLE_SCALAR = re.compile(
-    r"^("
-    r"(false|False|FALSE|true|True|TRUE|null|Null|NULL|~)|"
-    r"([-+]?[0-9_]*\.?[0-9_]*([eE][-+]?[0-9_]+)?|[-+]?\.inf|[-+]?\.Inf|[-+]?\.INF|\.nan|\.NaN|\.NAN|0o[0-7]+|0x[0-9a-fA-F]+)|"
-    r"(([0-9]{4})-([0-9][0-9]?)-([0-9][0-9]?)"
-    r"([Tt \t]([0-9][0-9]?):([0-9][0-9]?):([0-9][0-9]?)(\.[0-9]*)?"
-    r"([ \t]*(Z|[+-][0-9][0-9]?(:([0-9][0-9]?))?))?)?)"
-    r")$"
+RE_ESCAPABLE = re.compile(r"[^ -\[\]-~]")  # Characters that 'unicode_escape' codec would escape (anything but printable ascii and '\\')
+NUMBER_LEADERS = "0123456789-+."  # Only scalars starting with one of these can be numbers or dates
+RE_NUMBER = re.compile(
+    r"[-+]?[0-9_]*\.?[0-9_]*([eE][-+]?[0-9_]+)?|[-+]?\.inf|[-+]?\.Inf|[-+]?\.INF|\.nan|\.NaN|\.NAN|0o[0-7]+|0x[0-9a-fA-F]+"
 )
+RE_TIMESTAMP = re.compile(
+    r"([0-9]{4})-([0-9][0-9]?)-([0-9][0-9]?)"
+    r"(?:[Tt \t]([0-9][0-9]?):([0-9][0-9]?):([0-9][0-9]?)(\.[0-9]*)?"
+    r"(?:[ \t]*(Z|[+-][0-9][0-9]?(?::[0-9][0-9]?)?))?)?"
+)
+FROM_ISO_DATE = getattr(datetime.date, "fromisoformat", None)  # python3.7+
+FROM_ISO_DATETIME = getattr(datetime.datetime, "fromisoformat", None)
+RE_NUMBER_MATCH = RE_NUMBER.fullmatch  # Bound methods, called for each scalar that looks like a number or a date
+RE_TIMESTAMP_MATCH = RE_TIMESTAMP.fullmatch
 
 CONSTANTS = {
     "null": None,
@@ -32,27 +33,27 @@ CONSTANTS = {
     "yes": True,
     "on": True,
 }
+CONSTANTS_ANYCASE = dict((cased, v) for k, v in CONSTANTS.items() for cased in (k, k.capitalize(), k.upper()))
+SCALAR_CONSTANTS = {  # Exact spellings recognized in plain scalars (without explicit !!bool tag)
+    "null": None,
+    "Null": None,
+    "NULL": None,
+    "~": None,
+    "false": False,
+    "False": False,
+    "FALSE": False,
+    "true": True,
+    "True": True,
+    "TRUE": True,
+}
 
 
-if PY2:
-    Optional = Union = None
-
-    def cleaned_number(text):
-        return text.replace("_", "")
-
-    def base64_decode(value):
-        return _checked_scalar(value).decode("base64")
-
-
-else:
-    import base64
-    from typing import Optional, Union
+UTC = datetime.timezone.utc
+TIMEZONES = {"Z": UTC}  # Parsed timezone offsets, by their textual representation
 
-    def cleaned_number(text):
-        return text
 
-    def base64_decode(value):
-        return base64.decodebytes(_checked_scalar(value).encode("ascii"))
+def base64_decode(value):
+    return base64.decodebytes(_checked_scalar(value).encode("ascii"))
 
 
 def shortened(text, size=32):  # type: (str, int) -> str
@@ -64,7 +65,11 @@ def shortened(text, size=32):  # type: (str, int) -> str
 
 
 def unicode_escaped(text):  # type: (str) -> str
-    return decode(codecs.encode(str(text), "unicode_escape")).replace('"', '\\"')
+    text = str(text)
+    if RE_ESCAPABLE.search(text) is not None:
+        text = decode(codecs.encode(text, "unicode_escape"))
+
+    return text.replace('"', '\\"')
 
 
 def double_quoted(text):  # type: (str) -> str
@@ -143,7 +148,6 @@ def to_float(text):  # type: (str) -> float
 
 
 def to_number(text):  # type: (str) -> Union[int, float]
-    text = cleaned_number(text)
     try:
         return int(text)
 
@@ -155,45 +159,65 @@ def to_timezone(text):  # type: (str) -> Optional[datetime.tzinfo]
     if text is None:
         return None
 
-    if text == "Z":
-        return UTC
+    tz = TIMEZONES.get(text)
+    if tz is None:
+        hours, _, minutes = text[1:].partition(":")
+        offset = int(hours) * 3600 + (int(minutes) * 60 if minutes else 0)
+        if text[0] == "-":
+            offset = -offset
 
-    hours, _, minutes = text.partition(":")
-    minutes = int(minutes) if minutes else 0
-    offset = int(hours) * 3600 + minutes * 60
-    return UTC if offset == 0 else dateutil.tz.tzoffset(text, offset)
+        tz = UTC if offset == 0 else datetime.timezone(datetime.timedelta(seconds=offset), text)
+        TIMEZONES[text] = tz
+
+    return tz
 
 
 def default_marshal(text):  # type: (Optional[str]) -> Union[str, int, float, list, dict, datetime.date, datetime.datetime]
     if not text:
         return text
 
-    match = RE_SIMPLE_SCALAR.match(text)
-    if match is None:
+    if text[0] not in NUMBER_LEADERS:
+        return SCALAR_CONSTANTS.get(text, text)
+
+    if text[4:5] == "-":
+        match = RE_TIMESTAMP_MATCH(text)
+        if match is not None:
+            y, m, d, hh, mm, ss, sf, tz = match.groups()  # Only the fields used are capturing groups
+            if FROM_ISO_DATE is not None:
+                # Lengths 10 and 19 correspond to canonical 'YYYY-MM-DD' and naive 'YYYY-MM-DD HH:MM:SS', which C code can parse
+                if hh is None:
+                    if len(text) == 10:
+                        return FROM_ISO_DATE(text)
+
+                elif len(text) == 19 and sf is None and tz is None:
+                    return FROM_ISO_DATETIME(text)
+
+            y = int(y)
+            m = int(m)
+            d = int(d)
+            if hh is None:
+                return datetime.date(y, m, d)
+
+            hh = int(hh)
+            mm = int(mm)
+            ss = int(ss)
+            sf = int(round(float(sf or 0) * 1000000))
+            try:
+                tz = to_timezone(tz)
+
+            except ValueError:  # Offsets of 24h or more can't be represented, leave such scalars as text
+                return text
+
+            return datetime.datetime(y, m, d, hh, mm, ss, sf, tz)
+
+    if RE_NUMBER_MATCH(text) is None:
         return text
 
-    _, constant, number, _, _, y, m, d, _, hh, mm, ss, sf, _, tz, _, _ = match.groups()
-    if constant is not None:
-        return CONSTANTS.get(constant.lower(), text)
-
-    if number is not None:
-        try:
-            return to_number(number)
-
-        except ValueError:
-            return text
-
-    y = int(y)
-    m = int(m)
-    d = int(d)
-    if hh is None:
-        return datetime.date(y, m, d)
+    try:
+        return to_number(text)
 
-    hh = int(hh)
-    mm = int(mm)
-    ss = int(ss)
-    sf = int(round(float(sf or 0) * 1000000))
-    return datetime.datetime(y, m, d, hh, mm, ss, sf, to_timezone(tz))
+    except ValueError:
+        return text
 
 
 def _checked_scalar(value):
@@ -269,9 +293,13 @@ class DefaultMarshaller:
 
     @staticmethod
     def bool(value):
-        value = CONSTANTS.get(_checked_scalar(value).lower())
-        if isinstance(value, bool):
-            return value
+        value = _checked_scalar(value)
+        result = CONSTANTS_ANYCASE.get(value)
+        if result is None:
+            result = CONSTANTS.get(value.lower())  # Rare mixed-case spelling, such as 'tRue'
+
+        if isinstance(result, bool):
+            return result
 
         raise ValueError()
 
@@ -289,13 +317,24 @@ class DefaultMarshaller:
 
     @staticmethod
     def float(value):
-        return to_float(cleaned_number(_checked_scalar(value)))
+        return to_float(_checked_scalar(value))
 
 
 class Marshallers(object):
-    providers = {"": DefaultMarshaller}
+    providers = {"": DefaultMarshaller}  # Change via add_provider()/remove_provider() only, they invalidate cached lookups
+
+    @classmethod
+    def add_provider(cls, prefix, provider):
+        cls.providers[prefix] = provider
+        cls.get_marshaller.cache_clear()
+
+    @classmethod
+    def remove_provider(cls, prefix):
+        cls.providers.pop(prefix, None)
+        cls.get_marshaller.cache_clear()
 
     @classmethod
+    @functools.lru_cache(maxsize=256)  # Tags tend to be repeated throughout a document
     def get_marshaller(cls, text):
         if text.startswith("!"):
             text = text[1:]
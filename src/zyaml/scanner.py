@@ -30,60 +30,76 @@ from .tokens import (
 
 
 RESERVED = "@`"
-RE_HEADERS = re.compile(r"^(\s*#|%|(---|\.\.\.)(\s|$))")
+# Kind of scalar started by a given character, indexed by ord(char) (0 for plain scalars)
+LEADER_RESERVED, LEADER_DOUBLE_QUOTE, LEADER_SINGLE_QUOTE, LEADER_LITERAL = range(1, 5)
+SCALAR_LEADERS = bytes(
+    LEADER_RESERVED if c in RESERVED else
+    LEADER_DOUBLE_QUOTE if c == '"' else
+    LEADER_SINGLE_QUOTE if c == "'" else
+    LEADER_LITERAL if c in "|>" else 0
+    for c in map(chr, range(256))
+)
+# (folded, keep, indent) for each valid literal style indicator, such as '|', '>-' or '|2+'
+LITERAL_STYLES = dict(
+    (leader + indicators, (leader == ">", keep, int(indent) if indent else None))
+    for leader in "|>"
+    for chomp, keep in (("", None), ("-", False), ("+", True))
+    for indent in ("",) + tuple("123456789")
+    for indicators in (chomp + indent, indent + chomp)
+)
+FLOW_PUNCTUATION = bytes(1 if chr(i) in "{}[]," else 0 for i in range(256))
+# Group that matched last tells what was found: 1 comment, 2 directive, 3-4 doc start, 5-6 doc end (4 and 6 when followed by space)
+RE_HEADERS = re.compile(r"^(?:(\s*#)|(%)|(---)(?:([ \t])|\s|$)|(\.\.\.)(?:([ \t])|\s|$))")
 RE_BLOCK_SEQUENCE = re.compile(r"\s*(-\s+(\S)|-\s*$)")
-RE_DOUBLE_QUOTE_END = re.compile(r'(^\s*"|[^\\]")\s*(.*?)\s*$')
-RE_SINGLE_QUOTE_END = re.compile(r"(^\s*'|[^']'([^']|$))")
-RE_CONTENT = re.compile(r"\s*(.*?)\s*$")
+RE_CONTENT = re.compile(r"\s*((?:.*\S)?)")
 
+# Bound methods of the per-line regexes above, saves an attribute lookup on each call
+RE_HEADERS_MATCH = RE_HEADERS.match
+RE_BLOCK_SEQUENCE_MATCH = RE_BLOCK_SEQUENCE.match
+RE_CONTENT_MATCH = RE_CONTENT.match
 
-def _get_literal_styled_token(linenum, start, style):
-    original = style
+
+def _literal_style_error(style):
     if len(style) > 3:
-        raise ParseError("Invalid literal style '%s', should be less than 3 chars" % style, linenum=linenum, indent=start)
+        return "Invalid literal style '%s', should be less than 3 chars" % style
 
-    keep = None
-    if "-" in style:
-        style = style.replace("-", "", 1)
-        keep = False
+    if "-" in style and "+" in style:
+        return "Ambiguous literal style '%s'" % style
 
-    if "+" in style:
-        if keep is not None:
-            raise ParseError("Ambiguous literal style '%s'" % original, linenum=linenum, indent=start)
+    if "0" in style:
+        return "Indent must be between 1 and 9"
 
-        keep = True
-        style = style.replace("+", "", 1)
+    return "Invalid literal style '%s'" % style
 
-    indent = None
-    if len(style) == 2:
-        indent = style[1]
-        style = style[0]
-        if not indent.isdigit():
-            raise ParseError("Invalid literal style '%s'" % original, linenum=linenum, indent=start)
 
-        indent = int(indent)
-        if indent < 1:
-            raise ParseError("Indent must be between 1 and 9", linenum=linenum, indent=start)
+def _get_literal_styled_token(linenum, start, style):
+    styled = LITERAL_STYLES.get(style)
+    if styled is None:
+        raise ParseError(_literal_style_error(style), linenum=linenum, indent=start)
 
-    return style == ">", keep, indent, ScalarToken(linenum, indent, None, style=original)
+    folded, keep, indent = styled
+    return folded, keep, indent, ScalarToken(linenum, indent, None, style=style)
 
 
 def _consume_literal(generator, linenum, start, style):
     folded, keep, indent, token = _get_literal_styled_token(linenum, start, style)
     lines = []
     while True:
-        try:
-            linenum, line_text = next(generator)
+        upcoming = next(generator, None)
+        if upcoming is None:  # End of stream
+            line_text = None
+            start = end = 0
+
+        else:
+            linenum, line_text = upcoming
             line_text = line_text.rstrip("\r\n")
-            m = RE_CONTENT.match(line_text)
-            start, end = m.span(1)
-            if start == end:
+            content = line_text.lstrip()
+            if not content:
                 lines.append(line_text)
                 continue
 
-        except StopIteration:
-            line_text = None
-            start = end = 0
+            start = len(line_text) - len(content)
+            end = start + len(content.rstrip())
 
         if indent is None:
             token.indent = indent = start if start != 0 else 1
@@ -95,7 +111,7 @@ def _consume_literal(generator, linenum, start, style):
             text = yaml_lines(lines, indent=indent, folded=folded, keep=keep)
             if keep is None:
                 if text:
-                    token.text = "%s\n" % text.rstrip()
+                    token.text = text.rstrip() + "\n"
 
                 else:
                     token.text = text
@@ -104,7 +120,7 @@ def _consume_literal(generator, linenum, start, style):
                 token.text = text.rstrip()
 
             else:
-                token.text = "%s\n" % text
+                token.text = text + "\n"
 
             if start >= end:
                 line_text = None
@@ -114,6 +130,32 @@ def _consume_literal(generator, linenum, start, style):
         lines.append(line_text)
 
 
+def _double_quote_end(line_text, start):
+    """Position of first '"' at or after 'start' that is not escaped by an odd number of backslashes, -1 if none"""
+    pos = line_text.find('"', start)
+    while pos > start:
+        escapes = pos
+        while escapes > start and line_text[escapes - 1] == "\\":
+            escapes -= 1
+
+        if (pos - escapes) % 2 == 0:
+            break
+
+        pos = line_text.find('"', pos + 1)
+
+    return pos
+
+
+def _single_quote_end(line_text, start):
+    """Position of first "'" at or after 'start' that is not part of an escaped "''" pair, -1 if none"""
+    end = len(line_text) - 1
+    pos = line_text.find("'", start)
+    while pos != -1 and pos < end and line_text[pos + 1] == "'":
+        pos = line_text.find("'", pos + 2)
+
+    return pos
+
+
 def _checked_string(linenum, start, end, line_text, token):
     if start >= end:
         line_text = None
@@ -124,89 +166,91 @@ def _checked_string(linenum, start, end, line_text, token):
 
 def _double_quoted(generator, linenum, start, end, line_text):
     token = ScalarToken(linenum, start, "", style='"')
-    try:
-        if start < end and line_text[start] == '"':  # Empty string
-            return _checked_string(linenum, start + 1, end, line_text, token)
-
-        lines = None
-        m = None
-        while m is None:
-            m = RE_DOUBLE_QUOTE_END.search(line_text, start)
-            if m is not None:
-                text = line_text[start:m.span(1)[1] - 1]
-                if lines is not None:
-                    lines.append(text)
-                    text = yaml_lines(lines, keep=True, continuations=True)
-
-                token.text = codecs.decode(text, "unicode_escape")
-                start, end = m.span(2)
-                return _checked_string(linenum, start, end, line_text, token)
-
-            if lines is None:
-                lines = [line_text[start:].rstrip()]
-                start = 0
+    if start < end and line_text[start] == '"':  # Empty string
+        return _checked_string(linenum, start + 1, end, line_text, token)
 
-            else:
-                lines.append(line_text.rstrip())
+    lines = None
+    while True:
+        quote_pos = _double_quote_end(line_text, start)
+        if quote_pos >= 0:
+            text = line_text[start:quote_pos]
+            if lines is not None:
+                lines.append(text)
+                text = yaml_lines(lines, keep=True, continuations=True)
+
+            if "\\" in text:
+                # Non-latin-1 characters are turned into '\u' escapes first, so they survive the round-trip through bytes
+                text = codecs.decode(text.encode("latin-1", "backslashreplace"), "unicode_escape")
+
+            token.text = text
+            m = RE_CONTENT_MATCH(line_text, quote_pos + 1)
+            start, end = m.span(1)
+            return _checked_string(linenum, start, end, line_text, token)
+
+        if lines is None:
+            lines = [line_text[start:].rstrip()]
+            start = 0
 
-            linenum, line_text = next(generator)
-            line_text = line_text.strip()
+        else:
+            lines.append(line_text.rstrip())
 
-    except StopIteration:
-        raise ParseError("Unexpected end, runaway double-quoted string at line %s?" % token.linenum)
+        upcoming = next(generator, None)
+        if upcoming is None:
+            raise ParseError("Unexpected end, runaway double-quoted string at line %s?" % token.linenum)
+
+        linenum, line_text = upcoming
+        line_text = line_text.strip()
 
 
 def _single_quoted(generator, linenum, start, end, line_text):
     token = ScalarToken(linenum, start, "", style="'")
-    try:
-        if start < end and line_text[start] == "'":  # Empty string
-            return _checked_string(linenum, start + 1, end, line_text, token)
-
-        lines = None
-        m = None
-        while m is None:
-            m = RE_SINGLE_QUOTE_END.search(line_text, start)
-            if m is not None:
-                quote_pos = m.span(1)[0]
-                if line_text[quote_pos] != "'":
-                    quote_pos = quote_pos + 1
-
-                text = line_text[start:quote_pos]
-                if lines is not None:
-                    lines.append(text)
-                    text = yaml_lines(lines, keep=True)
-                    token.multiline = True
-
-                token.text = text.replace("''", "'")
-                m = RE_CONTENT.match(line_text, quote_pos + 1)
-                start, end = m.span(1)
-                return _checked_string(linenum, start, end, line_text, token)
-
-            if lines is None:
-                lines = [line_text[start:].rstrip()]
-                start = 0
+    if start < end and line_text[start] == "'":  # Empty string
+        return _checked_string(linenum, start + 1, end, line_text, token)
 
-            else:
-                lines.append(line_text.rstrip())
+    lines = None
+    while True:
+        quote_pos = _single_quote_end(line_text, start)
+        if quote_pos >= 0:
+            text = line_text[start:quote_pos]
+            if lines is not None:
+                lines.append(text)
+                text = yaml_lines(lines, keep=True)
+                token.multiline = True
+
+            token.text = text.replace("''", "'")
+            m = RE_CONTENT_MATCH(line_text, quote_pos + 1)
+            start, end = m.span(1)
+            return _checked_string(linenum, start, end, line_text, token)
+
+        if lines is None:
+            lines = [line_text[start:].rstrip()]
+            start = 0
 
-            linenum, line_text = next(generator)
-            line_text = line_text.strip()
+        else:
+            lines.append(line_text.rstrip())
 
-    except StopIteration:
-        raise ParseError("Unexpected end, runaway single-quoted string at line %s?" % token.linenum)
+        upcoming = next(generator, None)
+        if upcoming is None:
+            raise ParseError("Unexpected end, runaway single-quoted string at line %s?" % token.linenum)
+
+        linenum, line_text = upcoming
+        line_text = line_text.strip()
 
 
 class ModalScanner(object):
     """Ancestor to block and flow modal scanners"""
 
+    __slots__ = ("scanner", "stack")
+
     line_regex = None  # type: re.Pattern
+    line_search = None  # Bound 'line_regex.search', shared by all instances of a given mode
 
     def __init__(self, scanner):
         self.scanner = scanner
-        self.stack = collections.deque()
+        self.stack = []
 
     def __repr__(self):
-        stacks = " / ".join("%s%s" % (s.short_name[0], s.indent) for s in self.stack)
+        stacks = " / ".join(["%s%s" % (s.short_name[0], s.indent) for s in self.stack])
         return "%s - %s" % (self.mode_name.lower(), stacks)
 
     @property
@@ -230,8 +274,14 @@ class ModalScanner(object):
 class BlockScanner(ModalScanner):
     """Scan tokens for block mode (default, exclusive with flow mode started by '[' or '{')"""
 
-    top_block = None  # type: Optional[Token]
-    line_regex = re.compile(r"""(#|\?\s|[!&*][^\s:\[\]{}]+|[:\[\]{}])\s*(\S?)""")
+    __slots__ = ("top_block",)
+
+    line_regex = re.compile(r"""((?<![^ \t])#|\?\s|[!&*][^\s:\[\]{}]+|[:\[\]{}])\s*""")
+    line_search = line_regex.search
+
+    def __init__(self, scanner):
+        super(BlockScanner, self).__init__(scanner)
+        self.top_block = None  # type: Optional[Token]
 
     def track_same_line_text(self, token):
         if token is not None and token.has_same_line_text:
@@ -242,11 +292,13 @@ class BlockScanner(ModalScanner):
     def auto_push(self, token, block):
         tb = self.top_block
         last_popped = None
-        while tb is not None and tb.indent > token.indent:
+        stack = self.stack
+        indent = token.indent
+        while tb is not None and tb.indent > indent:
             try:
                 yield BlockEndToken(token.linenum, tb.indent)
-                last_popped = self.stack.pop()
-                self.top_block = tb = self.stack[-1]
+                last_popped = stack.pop()
+                self.top_block = tb = stack[-1]
 
             except IndexError:
                 # Top-most block can't be popped: it sets the minimum indentation for the entire document
@@ -277,7 +329,10 @@ class BlockScanner(ModalScanner):
 class FlowScanner(ModalScanner):
     """Scan tokens for flow mode (started by '[' or '{', exclusive with block mode)"""
 
-    line_regex = re.compile(r"""(#|[!&*][^\s:,\[\]{}]+|[:,\[\]{}])\s*(\S?)""")
+    __slots__ = ()
+
+    line_regex = re.compile(r"""((?<![^ \t])#|[!&*][^\s:,\[\]{}]+|[:,\[\]{}])\s*""")
+    line_search = line_regex.search
     flow_closers = {"]": FlowSeqToken, "}": FlowMapToken}
 
     def auto_push(self, token, block):
@@ -287,6 +342,36 @@ class FlowScanner(ModalScanner):
 
 
 class Scanner(object):
+
+    __slots__ = (
+        "generator",
+        "comments",
+        "block_scanner",
+        "flow_scanner",
+        "mode",
+        "yaml_directive",
+        "directives",
+        "needs_doc",
+        "accumulated_scalar",
+        "simple_key",
+        "explicit_map",
+        "decorators",
+    )
+
+    tokenizer_map = {
+        "!": TagToken,
+        "&": AnchorToken,
+        "*": AliasToken,
+        "{": FlowMapToken,
+        "}": FlowEndToken,
+        "[": FlowSeqToken,
+        "]": FlowEndToken,
+        ",": CommaToken,  # only in flows
+        "?": ExplicitMapToken,  # only in blocks
+        ":": ColonToken,
+    }
+    tokenizer_table = tuple(map(tokenizer_map.get, map(chr, range(128))))  # Indexed by ord(), all tokenizer chars are ASCII
+
     def __init__(self, stream, comments=False):
         self.generator = enumerate(stream, start=1)
         self.comments = comments
@@ -300,18 +385,6 @@ class Scanner(object):
         self.simple_key = None  # type: Optional[ScalarToken]
         self.explicit_map = None  # type: Optional[ExplicitMapToken]
         self.decorators = collections.deque()
-        self.tokenizer_map = {
-            "!": TagToken,
-            "&": AnchorToken,
-            "*": AliasToken,
-            "{": FlowMapToken,
-            "}": FlowEndToken,
-            "[": FlowSeqToken,
-            "]": FlowEndToken,
-            ",": CommaToken,  # only in flows
-            "?": ExplicitMapToken,  # only in blocks
-            ":": ColonToken,
-        }
 
     def __repr__(self):
         return str(self.mode)
@@ -378,8 +451,10 @@ class Scanner(object):
         for t in self.auto_popped_scalar():
             yield t
 
-        while self.block_scanner.stack:
-            yield BlockEndToken(token.linenum, self.block_scanner.stack.pop().indent)
+        stack = self.block_scanner.stack
+        linenum = token.linenum
+        while stack:
+            yield BlockEndToken(linenum, stack.pop().indent)
 
         if not self.needs_doc:
             self.needs_doc = True
@@ -389,18 +464,19 @@ class Scanner(object):
     def next_match(self, linenum, start, end, line_text):
         rstart = start
         seen_colon = False
+        mode = self.mode  # Mode can only change once a yielded token was consumed, state below is refreshed accordingly
+        in_block = mode is self.block_scanner
+        search = mode.line_search
+        tokenizer_table = self.tokenizer_table
         while start < end:
-            m = self.mode.line_regex.search(line_text, rstart)
+            m = search(line_text, rstart)
             if m is None:
                 break
 
             mstart, mend = m.span(1)  # span1: what we just matched
-            rstart = m.span(2)[0]  # span2: first non-space for the rest of the string
+            rstart = m.end()  # First non-space for the rest of the string
             matched = line_text[mstart]
             if matched == "#":
-                if line_text[mstart - 1] not in " \t":
-                    continue
-
                 if start < mstart:
                     yield None, start, line_text[start:mstart].rstrip()
 
@@ -414,14 +490,14 @@ class Scanner(object):
                 if rstart == end:
                     actionable = True
 
-                elif self.mode is self.block_scanner:
-                    actionable = line_text[mstart + 1] in " \t"
+                elif in_block:
+                    actionable = line_text[mend] in " \t"
 
                 else:
-                    actionable = line_text[mstart - 1] in "\"'" or line_text[mstart + 1] in " \t,"
+                    actionable = line_text[mend] in " \t," or line_text[mstart - 1] in "\"'"
 
                 if actionable:
-                    if seen_colon and self.mode is self.block_scanner:
+                    if seen_colon and in_block:
                         raise ParseError("Nested mappings are not allowed in compact mappings", linenum=linenum, indent=mstart)
 
                     seen_colon = True
@@ -429,8 +505,8 @@ class Scanner(object):
             elif start == mstart:
                 actionable = True
 
-            elif self.mode is self.flow_scanner:
-                actionable = matched in "{}[],"
+            elif not in_block:
+                actionable = FLOW_PUNCTUATION[ord(matched)]
 
             else:
                 actionable = False
@@ -439,9 +515,13 @@ class Scanner(object):
                 if start < mstart:
                     yield None, start, line_text[start:mstart].rstrip()
 
-                tokenizer = self.tokenizer_map.get(matched)
+                tokenizer = tokenizer_table[ord(matched)]
                 yield tokenizer(linenum, mstart, line_text[mstart:mend]), None, None
                 start = rstart
+                if self.mode is not mode:  # Token switched between block and flow mode
+                    mode = self.mode
+                    in_block = mode is self.block_scanner
+                    search = mode.line_search
 
         if start < end:
             yield None, start, line_text[start:end]
@@ -449,27 +529,27 @@ class Scanner(object):
     def headers(self, linenum, start, line_text):
         while True:
             if line_text is None:
-                try:
-                    linenum, line_text = next(self.generator)
-                    line_text = line_text.rstrip("\r\n")
-                    if not line_text and self.accumulated_scalar is None and self.simple_key is None:
-                        line_text = None
-                        continue
-
-                    start = 0
-
-                except StopIteration:
+                upcoming = next(self.generator, None)
+                if upcoming is None:  # End of stream
                     yield None, None
                     return
 
+                linenum, line_text = upcoming
+                line_text = line_text.rstrip("\r\n")
+                if not line_text and self.accumulated_scalar is None and self.simple_key is None:
+                    line_text = None
+                    continue
+
+                start = 0
+
             m = None
             if start == 0 and self.mode is self.block_scanner:
-                m = RE_HEADERS.match(line_text)
+                m = RE_HEADERS_MATCH(line_text)
 
             if m is None:
                 # No headers, look for block sequence starts
                 if self.mode is self.block_scanner:
-                    m = RE_BLOCK_SEQUENCE.match(line_text, start)
+                    m = RE_BLOCK_SEQUENCE_MATCH(line_text, start)
 
                 while m is not None:
                     start = m.span(1)[0]
@@ -479,13 +559,13 @@ class Scanner(object):
                         line_text = None
                         break
 
-                    m = RE_BLOCK_SEQUENCE.match(line_text, start)
+                    m = RE_BLOCK_SEQUENCE_MATCH(line_text, start)
 
                 if line_text is None:
                     continue
 
                 # Done with block sequence starts, look at line content
-                m = RE_CONTENT.match(line_text, start)
+                m = RE_CONTENT_MATCH(line_text, start)
                 first_non_blank, end = m.span(1)
                 if start == 0 and first_non_blank == end and self.simple_key is not None:
                     yield None, ScalarToken(linenum, start, "")
@@ -496,34 +576,25 @@ class Scanner(object):
                 return
 
             # Headers were present
-            start, end = m.span(1)
-            matched = line_text[start:end]
-            if matched[0] == "-":
-                yield None, DocumentStartToken(linenum, 0)
-                if matched[-1] in " \t":
-                    start = end
-
-                else:
-                    line_text = None
-
-            elif matched[0] == ".":
-                yield None, DocumentEndToken(linenum, 0)
-                if matched[-1] in " \t":
-                    start = end
+            kind = m.lastindex
+            if kind == 1:  # Matching a '#' comment
+                self.mark_comment()
+                if self.comments:
+                    yield None, CommentToken(linenum, 0, line_text)
 
-                else:
-                    line_text = None
+                line_text = None
 
-            elif matched[-1] == "%":
-                yield None, DirectiveToken(linenum, end, line_text)
+            elif kind == 2:
+                yield None, DirectiveToken(linenum, 1, line_text)
                 line_text = None
 
-            else:  # Matching a '#' comment
-                self.mark_comment()
-                if self.comments:
-                    yield None, CommentToken(linenum, start, line_text[start:])
+            else:
+                yield None, DocumentStartToken(linenum, 0) if kind <= 4 else DocumentEndToken(linenum, 0)
+                if kind == 4 or kind == 6:  # Marker followed by a space or tab, rest of line has content
+                    start = m.end()
 
-                line_text = None
+                else:
+                    line_text = None
 
     def mark_comment(self):
         sk = self.simple_key
@@ -563,11 +634,14 @@ class Scanner(object):
 
     def _raw_tokens(self):
         """Pass 1: yield raw tokens as-is, don't try to interpret simple keys, nor look at indentation etc"""
+        headers = self.headers
+        next_match = self.next_match
+        generator = self.generator
         start = 0
         linenum = 1
         upcoming = None
         while True:
-            for upcoming, token in self.headers(linenum, start, upcoming):
+            for upcoming, token in headers(linenum, start, upcoming):
                 if token is not None:
                     yield token
 
@@ -576,27 +650,26 @@ class Scanner(object):
 
             linenum, start, end, line_text = upcoming
             upcoming = None
-            for token, offset, text in self.next_match(linenum, start, end, line_text):
+            for token, offset, text in next_match(linenum, start, end, line_text):
                 if token is not None:
                     yield token
                     continue
 
-                first_char = text[0]
-                if first_char in RESERVED:
-                    raise ParseError("Character '%s' is reserved" % first_char, linenum=linenum, indent=offset)
+                code = ord(text[0])
+                leader = SCALAR_LEADERS[code] if code < 256 else 0
+                if leader:
+                    if leader == LEADER_RESERVED:
+                        raise ParseError("Character '%s' is reserved" % text[0], linenum=linenum, indent=offset)
 
-                if first_char == '"':
-                    linenum, start, end, upcoming, token = _double_quoted(self.generator, linenum, offset + 1, end, line_text)
-                    yield token
-                    break
+                    if leader == LEADER_DOUBLE_QUOTE:
+                        linenum, start, end, upcoming, token = _double_quoted(generator, linenum, offset + 1, end, line_text)
 
-                if first_char == "'":
-                    linenum, start, end, upcoming, token = _single_quoted(self.generator, linenum, offset + 1, end, line_text)
-                    yield token
-                    break
+                    elif leader == LEADER_SINGLE_QUOTE:
+                        linenum, start, end, upcoming, token = _single_quoted(generator, linenum, offset + 1, end, line_text)
+
+                    else:
+                        linenum, start, end, upcoming, token = _consume_literal(generator, linenum, offset, text)
 
-                if first_char in "|>":
-                    linenum, start, end, upcoming, token = _consume_literal(self.generator, linenum, offset, text)
                     yield token
                     break
 
@@ -1,4 +1,5 @@
 import re
+import sys
 
 from .marshal import default_marshal, Marshallers, ParseError, represented_scalar, unicode_escaped
 
@@ -19,6 +20,15 @@ def yaml_lines(lines, text=None, indent=None, folded=None, keep=False, continuat
     Returns:
         (str): Concatenated string, with yaml's weird convention
     """
+    if text is None:
+        started = False
+        parts = []
+
+    else:
+        started = True
+        parts = [text] if text else []  # Non-empty fragments only, joined once at the end
+
+    append = parts.append
     empty = 0
     was_over_indented = False
     for line in lines:
@@ -33,42 +43,74 @@ def yaml_lines(lines, text=None, indent=None, folded=None, keep=False, continuat
                 elif was_over_indented:
                     was_over_indented = False
 
-        if text is None:
-            text = line
+        if not started:
+            started = True
+            if line:
+                append(line)
 
-        elif folded is not None and not text:
-            text = "\n%s" % line
+        elif folded is not None and not parts:
+            append("\n")
+            if line:
+                append(line)
 
         elif not line:
             empty = empty + 1
 
-        elif continuations and text[-1:] == "\\" and text[-2:] != "\\\\":
-            text = "".join((text[:-1], "\n" * empty, line))
-            empty = 0
+        elif continuations and parts and parts[-1][-1] == "\\" and _before_last_char(parts) != "\\":
+            last = parts.pop()[:-1]
+            if last:
+                append(last)
+
+            if empty:
+                append("\n" * empty)
+                empty = 0
+
+            append(line)
 
         elif empty > 0:
-            text = "".join((text, "\n" * empty, "\n" if folded is False else "", line))
+            append("\n" * empty)
+            if folded is False:
+                append("\n")
+
+            append(line)
             empty = 1 if was_over_indented else 0
 
         else:
-            text = "".join((text, "\n" if folded is False else " ", line))
+            append("\n" if folded is False else " ")
+            append(line)
+
+    if not started:
+        return None
 
     if empty and keep:
         if indent is None:
             if empty == 1:
-                text = "%s " % text
+                append(" ")
 
         if was_over_indented or continuations or indent is None:
             empty = empty - 1
 
-        text = "".join((text, "\n" * empty))
+        if empty:
+            append("\n" * empty)
+
+    return "".join(parts)
+
+
+def _before_last_char(parts):
+    """Character preceding the last one in the concatenation of (non-empty) 'parts'"""
+    last = parts[-1]
+    if len(last) > 1:
+        return last[-2]
+
+    if len(parts) > 1:
+        return parts[-2][-1]
 
-    return text
+    return ""
 
 
 class VisitedToken(object):
 
-    value = None
+    __slots__ = ("value",)
 
     def resolved_value(self):
         return self.value
@@ -89,6 +131,8 @@ class VisitedToken(object):
 class Token(VisitedToken):
     """Represents one scanned token"""
 
+    __slots__ = ("linenum", "indent", "indent_constraint", "text")
+
     has_same_line_text = False  # Used to disambiguate simple keys
 
     def __init__(self, linenum, indent, text=None, value=None):
@@ -153,27 +197,35 @@ class Token(VisitedToken):
 
 
 class CommentToken(Token):
-    pass
+
+    __slots__ = ()
 
 
 class DocAgnostic(Token):
-    pass
+
+    __slots__ = ()
 
 
 class StreamStartToken(DocAgnostic):
 
+    __slots__ = ()
+
     def evaluate(self, visitor):
         pass
 
 
 class StreamEndToken(DocAgnostic):
 
+    __slots__ = ()
+
     def evaluate(self, visitor):
         pass
 
 
 class DocumentStartToken(DocAgnostic):
 
+    __slots__ = ()
+
     def auto_filler(self, scanner):
         for t in scanner.auto_pop_all(self):
             yield t
@@ -190,6 +242,8 @@ class DocumentStartToken(DocAgnostic):
 
 class DocumentEndToken(DocAgnostic):
 
+    __slots__ = ()
+
     def auto_filler(self, scanner):
         for t in scanner.auto_pop_all(self):
             yield t
@@ -204,6 +258,8 @@ class DocumentEndToken(DocAgnostic):
 
 class DirectiveToken(DocAgnostic):
 
+    __slots__ = ("name",)
+
     def __init__(self, linenum, indent, text):
         if indent != 1:
             raise ParseError("Directive must not be indented", token=self)
@@ -240,6 +296,8 @@ class DirectiveToken(DocAgnostic):
 
 class StackedValue(Token):
 
+    __slots__ = ()
+
     def evaluate(self, visitor):
         while True:
             popped = visitor.pop()
@@ -251,6 +309,8 @@ class StackedValue(Token):
 
 class StackedMap(StackedValue):
 
+    __slots__ = ("needs_wrap", "pending_key")
+
     def __init__(self, linenum, indent, text=None):
         super(StackedMap, self).__init__(linenum, indent, text=text, value={})
         self.needs_wrap = False
@@ -268,6 +328,9 @@ class StackedMap(StackedValue):
         if self.needs_wrap:
             self.value[self.pending_key] = None
 
+        if type(value) is str:
+            value = sys.intern(value)  # Keys tend to repeat across records, share one object (and its cached hash) per spelling
+
         self.pending_key = value
         self.needs_wrap = True
 
@@ -293,6 +356,8 @@ class StackedMap(StackedValue):
 
 class StackedSequence(StackedValue):
 
+    __slots__ = ("needs_wrap",)
+
     def __init__(self, linenum, indent, text=None):
         super(StackedSequence, self).__init__(linenum, indent, text=text, value=[])
         self.needs_wrap = False
@@ -332,6 +397,8 @@ class StackedSequence(StackedValue):
 
 class FlowMapToken(StackedMap):
 
+    __slots__ = ()
+
     has_same_line_text = True
 
     def auto_filler(self, scanner):
@@ -341,6 +408,8 @@ class FlowMapToken(StackedMap):
 
 class FlowSeqToken(StackedSequence):
 
+    __slots__ = ()
+
     has_same_line_text = True
 
     def auto_filler(self, scanner):
@@ -353,6 +422,8 @@ class FlowSeqToken(StackedSequence):
 
 class FlowEndToken(StackedValue):
 
+    __slots__ = ()
+
     def auto_filler(self, scanner):
         for t in scanner.auto_popped_scalar():
             yield t
@@ -374,12 +445,17 @@ class FlowEndToken(StackedValue):
 
 
 class CommaToken(Token):
-    pass
+
+    __slots__ = ()
 
 
 class BlockMapToken(StackedMap):
 
-    current_line_text = None
+    __slots__ = ("current_line_text",)
+
+    def __init__(self, linenum, indent, text=None):
+        super(BlockMapToken, self).__init__(linenum, indent, text=text)
+        self.current_line_text = None
 
     def track_same_line_text(self, token):
         if self.linenum == token.linenum:
@@ -393,17 +469,22 @@ class BlockMapToken(StackedMap):
 
 class BlockSeqToken(StackedSequence):
 
+    __slots__ = ()
+
     def track_same_line_text(self, token):
         if token.indent <= self.indent and token.textually_significant:
             raise ParseError("%s under-indented relative to previous sequence" % token.short_name, token=token)
 
 
 class BlockEndToken(StackedValue):
-    pass
+
+    __slots__ = ()
 
 
 class ExplicitMapToken(Token):
 
+    __slots__ = ()
+
     def auto_filler(self, scanner):
         for t in scanner.auto_push(KeyToken(self.linenum, self.indent), BlockMapToken):
             yield t
@@ -413,6 +494,8 @@ class ExplicitMapToken(Token):
 
 class DashToken(Token):
 
+    __slots__ = ()
+
     def auto_filler(self, scanner):
         for t in scanner.auto_push(self, BlockSeqToken):
             yield t
@@ -420,11 +503,15 @@ class DashToken(Token):
         yield self
 
     def evaluate(self, visitor):
-        visitor.top.needs_wrap = True
+        top = visitor.top
+        if isinstance(top, (StackedMap, StackedSequence)):
+            top.needs_wrap = True
 
 
 class KeyToken(Token):
 
+    __slots__ = ()
+
     def auto_pop(self, visitor, token):
         visitor.pop()
         visitor.consume_key(token.resolved_value())
@@ -435,6 +522,8 @@ class KeyToken(Token):
 
 class ValueToken(Token):
 
+    __slots__ = ()
+
     def auto_pop(self, visitor, token):
         visitor.pop()
         visitor.consume_value(token.resolved_value())
@@ -445,6 +534,8 @@ class ValueToken(Token):
 
 class ColonToken(Token):
 
+    __slots__ = ()
+
     def auto_filler(self, scanner):
         if scanner.explicit_map is not None:
             for t in scanner.auto_popped_scalar():
@@ -476,6 +567,8 @@ class ColonToken(Token):
 
 class TagToken(Token):
 
+    __slots__ = ("marshaller",)
+
     def __init__(self, linenum, indent, text):
         super(TagToken, self).__init__(linenum, indent, text)
         self.marshaller = Marshallers.get_marshaller(text)
@@ -486,6 +579,8 @@ class TagToken(Token):
 
 class AnchorToken(Token):
 
+    __slots__ = ()
+
     def __init__(self, linenum, indent, text):
         super(AnchorToken, self).__init__(linenum, indent, text[1:])
 
@@ -498,6 +593,8 @@ class AnchorToken(Token):
 
 class AliasToken(Token):
 
+    __slots__ = ("anchor",)
+
     def __init__(self, linenum, indent, text):
         super(AliasToken, self).__init__(linenum, indent)
         self.anchor = text[1:]
@@ -508,6 +605,8 @@ class AliasToken(Token):
 
 class ScalarToken(Token):
 
+    __slots__ = ("style", "multiline", "has_comment")
+
     has_same_line_text = True
 
     def __init__(self, linenum, indent, text, style=None):
@@ -1,9 +1,10 @@
-import collections
-
 from .tokens import Token, VisitedToken
 
 
 class DocumentStack(VisitedToken):
+
+    __slots__ = ("doc_count",)
+
     def __init__(self):
         self.doc_count = 0
         self.value = []
@@ -22,15 +23,15 @@ class DocumentStack(VisitedToken):
 
 class TokenVisitor(object):
 
-    top = None  # type: Token
+    __slots__ = ("top", "documents", "root")
 
     def __init__(self):
+        self.top = None  # type: Token
         self.documents = DocumentStack()
-        self.root = collections.deque()
-        self.root.append(self.documents)
+        self.root = [self.documents]
 
     def __repr__(self):
-        return " %s" % " / ".join(t.short_name for t in self.root)
+        return " %s" % " / ".join([t.short_name for t in self.root])
 
     def deserialized(self, tokens):
         """
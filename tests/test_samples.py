@@ -1,3 +1,4 @@
+import datetime
 import math
 
 import pytest
@@ -97,11 +98,19 @@ def test_edge_cases():
     assert loaded("#comment\\n\n") is None
     assert loaded("_") == "_"
     assert loaded("''") == ""
+    assert loaded("'a'''") == "a'"
+    assert loaded("'a\n ''b'''") == "a 'b'"
+    assert loaded('"a\\\\"') == "a\\"
+    assert loaded('"a\\"b"') == 'a"b'
+    assert loaded('"caf\u00e9"') == "caf\u00e9"
+    assert loaded('"\u65e5\\t\\u00e9"') == "\u65e5\t\u00e9"
     assert loaded("---a") == "---a"
     assert loaded(" ---") == "---"
     assert loaded('a-{}: ""') == {"a-{}": ""}
     assert loaded("[]\n---\n[]") == [[], []]
     assert loaded("-   ") == [None]
+    assert loaded("a: >-2\n   b\n") == {"a": " b"}
+    assert loaded("a: |12\n  b") == "Invalid literal style '|12', line 1 column 4"
 
     # assert loaded("- a:\n  b") == "Value must be indented at least 4 columns, line 2 column 3"
     assert loaded("- a:\n   b") == [{"a": "b"}]
@@ -127,6 +136,13 @@ def test_edge_cases():
 
     assert loaded("foo # bar") == "foo"
     assert loaded("foo# bar") == "foo# bar"
+    assert loaded("[\n#x\n]") == []
+    assert loaded("a: \xa0 # note") == {"a": None}
+    assert loaded("---: \xa0 #1") == {"---": None}
+    assert loaded("[\xa0]  ") == []
+    assert loaded("[\x0c]") == []
+    assert loaded(":\xa0") == ":"
+    assert loaded("{a: b\n#x\n}") == {"a": "b"}
     assert loaded("a\nb") == "a b"
     assert loaded("a\n\nb") == "a\nb"
 
@@ -166,6 +182,13 @@ def test_edge_cases():
     assert loaded("0xG") == "0xG"
     assert loaded("0xg") == "0xg"
 
+    assert loaded("2019-01-01 01:02:03Z").tzinfo is UTC
+    assert loaded("2019-01-01 01:02:03 +05:30").utcoffset() == datetime.timedelta(hours=5, minutes=30)
+    assert loaded("2019-01-01 01:02:03 -05:30").utcoffset() == -datetime.timedelta(hours=5, minutes=30)
+    assert loaded("2019-01-01 01:02:03 -05:30").tzname() == "-05:30"
+    assert loaded("2019-01-01 01:02:03-00").tzinfo is UTC
+    assert loaded("a: 2019-01-01 01:02:03 +24") == {"a": "2019-01-01 01:02:03 +24"}
+
 
 @pytest.mark.skip("broken after refactor")
 def test_types():
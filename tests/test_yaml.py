@@ -1,4 +1,9 @@
-from zyaml.marshal import default_marshal, ParseError
+import datetime
+
+import runez
+
+from zyaml import load_paths
+from zyaml.marshal import default_marshal, DefaultMarshaller, Marshallers, ParseError
 from zyaml.tokens import yaml_lines
 
 
@@ -33,3 +38,26 @@ def test_scalar():
     assert default_marshal("0.1.1") == "0.1.1"
     assert default_marshal("+135.057E+3") == 135057
     assert default_marshal("_") == "_"
+
+
+def test_marshallers():
+    assert Marshallers.get_marshaller("!!int") is DefaultMarshaller.int
+    assert Marshallers.get_marshaller("!custom!int") is None
+    try:
+        Marshallers.add_provider("custom", DefaultMarshaller)
+        assert Marshallers.get_marshaller("!custom!int") is DefaultMarshaller.int
+
+    finally:
+        Marshallers.remove_provider("custom")
+
+    assert Marshallers.get_marshaller("!custom!int") is None
+
+
+def test_load_paths():
+    with runez.TempFolder():
+        runez.write("a.yml", "a: 1\nb:\n  - c\n  - d", logger=None)
+        runez.write("b.yml", "- 2019-01-01\n- true", logger=None)
+        runez.write("c.yml", "a\n---\nb", logger=None)
+        expected = [{"a": 1, "b": ["c", "d"]}, [datetime.date(2019, 1, 1), True], ["a", "b"]]
+        assert load_paths(["a.yml", "b.yml", "c.yml"], workers=2) == expected
+        assert load_paths([], workers=1) == []